@@ -1,39 +1,87 @@
 import os
 import re
-import uuid
+import gzip
+import json
+import atexit
+import base64
+import queue
+import time
 import shutil
+import itertools
+import hashlib
 import logging
 import tempfile
 import struct
 import zlib
 import threading
-from datetime import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from flask import (
     Flask,
     request,
     send_file,
-    render_template_string,
     abort,
     jsonify,
     Response,
 )
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+import fitz
 from pdf2docx import Converter
 
+try:
+    from libdeflate import crc32 as _crc32
+except ImportError:
+    _crc32 = zlib.crc32
+
+try:
+    from docx import Document
+    from docxcompose.composer import Composer
+except ImportError:
+    Document = None
+    Composer = None
+
+try:
+    from orjson import dumps as _json_dumps
+except ImportError:
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 app = Flask(__name__)
 app.config["MAX_CONTENT_LENGTH"] = 35 * 1024 * 1024
+USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
+app.use_x_sendfile = USE_X_SENDFILE
 
 APP_NAME = "NebulaDOC X"
 APP_SHORT_NAME = "NDX"
 OUTPUT_FILENAME_PREFIX = "nebuladocx"
-ALLOWED_EXTENSIONS = {".pdf"}
 APP_VERSION = "1.1.0"
+ASSET_PREFIX = f"/static/{APP_VERSION}"
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
-TEMP_DIR = os.path.join(BASE_DIR, "tmp")
 COUNTER_FILE = os.path.join(BASE_DIR, "conversion_count.txt")
+
+_SHM_MIN_FREE_BYTES = 256 * 1024 * 1024
+
+
+def _pick_temp_dir() -> str:
+    if hasattr(os, "statvfs"):
+        try:
+            stats = os.statvfs("/dev/shm")
+            if stats.f_bavail * stats.f_frsize >= _SHM_MIN_FREE_BYTES:
+                return "/dev/shm/pdftodocx"
+        except OSError:
+            pass
+    return os.path.join(BASE_DIR, "tmp")
+
+
+TEMP_DIR = _pick_temp_dir()
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(TEMP_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s :: %(message)s"
@@ -41,62 +89,342 @@ logging.basicConfig(
 logger = logging.getLogger("nebuladocx")
 counter_lock = threading.Lock()
 
+# Under spawn (Windows) every pool worker re-imports this module; the
+# background threads and scratch files belong to the serving process only.
+_IS_POOL_WORKER = multiprocessing.parent_process() is not None
+
+# os.supports_dir_fd registers renameat support under os.rename only, even
+# though os.replace accepts dir_fd too — checking os.replace is always False.
+if os.open in os.supports_dir_fd and os.rename in os.supports_dir_fd:
+    _BASE_DIR_FD = os.open(BASE_DIR, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    _COUNTER_NAME = os.path.basename(COUNTER_FILE)
+else:
+    _BASE_DIR_FD = None
+    _COUNTER_NAME = COUNTER_FILE
+
 
 def _read_conversion_count_unlocked() -> int:
     try:
-        with open(COUNTER_FILE, "r", encoding="utf-8") as file:
-            raw_value = file.read().strip()
-            return int(raw_value) if raw_value else 0
+        fd = os.open(_COUNTER_NAME, os.O_RDONLY, dir_fd=_BASE_DIR_FD)
+        try:
+            raw_value = os.read(fd, 32).strip()
+        finally:
+            os.close(fd)
+        return int(raw_value) if raw_value else 0
     except (FileNotFoundError, ValueError, OSError):
         return 0
 
 
+_conversion_count = _read_conversion_count_unlocked()
+
+
 def get_conversion_count() -> int:
-    with counter_lock:
-        return _read_conversion_count_unlocked()
+    return _conversion_count
+
+
+def _flush_conversion_count(value: int) -> None:
+    temp_name = _COUNTER_NAME + ".tmp"
+    try:
+        fd = os.open(
+            temp_name,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o644,
+            dir_fd=_BASE_DIR_FD,
+        )
+        try:
+            os.write(fd, str(value).encode("ascii"))
+        finally:
+            os.close(fd)
+        os.replace(
+            temp_name,
+            _COUNTER_NAME,
+            src_dir_fd=_BASE_DIR_FD,
+            dst_dir_fd=_BASE_DIR_FD,
+        )
+    except OSError:
+        logger.warning("Sayaç dosyası yazılamadı: %s", COUNTER_FILE)
+
+
+COUNTER_FLUSH_INTERVAL_SECONDS = 30.0
+_counter_dirty = threading.Event()
+
+
+def _counter_flush_loop() -> None:
+    while True:
+        _counter_dirty.wait()
+        time.sleep(COUNTER_FLUSH_INTERVAL_SECONDS)
+        _counter_dirty.clear()
+        _flush_conversion_count(get_conversion_count())
+
+
+def _flush_counter_at_exit() -> None:
+    if _counter_dirty.is_set():
+        _flush_conversion_count(get_conversion_count())
+
+
+if not _IS_POOL_WORKER:
+    threading.Thread(
+        target=_counter_flush_loop, daemon=True, name="counter-flush"
+    ).start()
+    atexit.register(_flush_counter_at_exit)
 
 
 def increment_conversion_count() -> int:
+    global _conversion_count
     with counter_lock:
-        new_count = _read_conversion_count_unlocked() + 1
-        with open(COUNTER_FILE, "w", encoding="utf-8") as file:
-            file.write(str(new_count))
-        return new_count
+        _conversion_count += 1
+        new_count = _conversion_count
+    _counter_dirty.set()
+    return new_count
+
+
+_ALLOWED_NAME_BYTES = frozenset(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._-"
+)
+_NAME_TABLE = bytes(
+    c if c in _ALLOWED_NAME_BYTES else ord("_") for c in range(256)
+)
+_UNDERSCORE_RUNS = re.compile(rb"_+")
 
 
 def sanitize_name(name: str) -> str:
     if not name:
         return "converted"
-    name = name.replace("\\", "/").strip()
-    name = os.path.basename(name)
-    name = re.sub(r"[^A-Za-z0-9._-]", "_", name)
-    name = re.sub(r"_+", "_", name).strip("._")
-    if not name:
-        return "converted"
-    return name
+    name = os.path.basename(name.replace("\\", "/").strip())
+    raw = name.encode("utf-8", "replace").translate(_NAME_TABLE)
+    raw = _UNDERSCORE_RUNS.sub(b"_", raw).strip(b"._")[:120]
+    return raw.decode("ascii") or "converted"
 
 
 def safe_unlink(path: str) -> None:
     try:
-        if path and os.path.exists(path):
-            os.remove(path)
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
     except OSError:
         logger.warning("Geçici dosya silinemedi: %s", path)
 
 
+CONVERT_TIMEOUT_SECONDS = 300
+CONVERT_WORKERS = max(
+    1, int(os.getenv("CONVERT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+)
+
+
+# Minimal blank single-page PDF used to prime each worker's font caches.
+_MIN_PDF_BYTES = base64.b64decode(
+    b"JVBERi0xLjcKJcK1wrYKJSBXcml0dGVuIGJ5IE11UERGIDEuMjguMgoKMSAwIG9iago8PC9UeXBl"
+    b"L0NhdGFsb2cvUGFnZXMgMiAwIFIvSW5mbzw8L1Byb2R1Y2VyKE11UERGIDEuMjguMik+Pj4+CmVu"
+    b"ZG9iagoKMiAwIG9iago8PC9UeXBlL1BhZ2VzL0NvdW50IDEvS2lkc1s0IDAgUl0+PgplbmRvYmoK"
+    b"CjMgMCBvYmoKPDw+PgplbmRvYmoKCjQgMCBvYmoKPDwvVHlwZS9QYWdlL01lZGlhQm94WzAgMCA1"
+    b"OTUgODQyXS9Sb3RhdGUgMC9SZXNvdXJjZXMgMyAwIFIvUGFyZW50IDIgMCBSPj4KZW5kb2JqCgp4"
+    b"cmVmCjAgNQowMDAwMDAwMDAwIDY1NTM1IGYgCjAwMDAwMDAwNDIgMDAwMDAgbiAKMDAwMDAwMDEy"
+    b"MCAwMDAwMCBuIAowMDAwMDAwMTcyIDAwMDAwIG4gCjAwMDAwMDAxOTMgMDAwMDAgbiAKCnRyYWls"
+    b"ZXIKPDwvU2l6ZSA1L1Jvb3QgMSAwIFIvSURbPEMyQjRDMjhFQzM4MDBGNzZDMkEwN0YwQ0MzODA0"
+    b"MkMyPjw0OUNGRkUxMzc4RTdCRjVCQzA4QjUwOTI0OTE3RTFCQz5dPj4Kc3RhcnR4cmVmCjI4NAol"
+    b"JUVPRgo="
+)
+
+
+def _worker_init() -> None:
+    from pdf2docx import Converter as _Converter
+
+    warm_path = os.path.join(TEMP_DIR, f"warmup_{os.getpid()}.docx")
+    try:
+        warm = _Converter(stream=_MIN_PDF_BYTES)
+        try:
+            warm.convert(warm_path, start=0, end=1)
+        finally:
+            warm.close()
+    except Exception:
+        logger.warning("Ön ısıtma dönüşümü başarısız oldu.")
+    finally:
+        safe_unlink(warm_path)
+
+
+def _new_convert_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=CONVERT_WORKERS, initializer=_worker_init
+    )
+
+
+CONVERT_POOL = _new_convert_pool()
+_pool_lock = threading.Lock()
+_convert_slots = threading.BoundedSemaphore(CONVERT_WORKERS * 2)
+
+
+def _reset_convert_pool(broken: ProcessPoolExecutor) -> None:
+    """Replace a crashed pool so one bad PDF doesn't take the service down."""
+    global CONVERT_POOL
+    with _pool_lock:
+        if CONVERT_POOL is broken:
+            CONVERT_POOL.shutdown(wait=False)
+            CONVERT_POOL = _new_convert_pool()
+            logger.warning("Dönüştürme havuzu çöktü; yeniden oluşturuldu.")
+
+_SCRATCH_POOL: "queue.Queue[str]" = queue.Queue()
+
+
+def _cleanup_scratch_pool() -> None:
+    while True:
+        try:
+            safe_unlink(_SCRATCH_POOL.get_nowait())
+        except queue.Empty:
+            break
+
+
+if not _IS_POOL_WORKER:
+    for _ in range(CONVERT_WORKERS * 2):
+        _scratch_fd, _scratch_path = tempfile.mkstemp(suffix=".pdf", dir=TEMP_DIR)
+        os.close(_scratch_fd)
+        _SCRATCH_POOL.put(_scratch_path)
+    atexit.register(_cleanup_scratch_pool)
+
+
+SMALL_PDF_LIMIT = 8 * 1024 * 1024
+MAX_PAGES = int(os.getenv("MAX_PAGES", "200"))
+
+
+def _page_count(src: str | bytes) -> int:
+    if isinstance(src, bytes):
+        doc = fitz.open(stream=src, filetype="pdf")
+    else:
+        doc = fitz.open(src)
+    with doc:
+        return doc.page_count
+
+
+PARALLEL_PAGE_THRESHOLD = 8
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL_SECONDS = 300.0
+
+
+def _save_upload(stream, dst_path: str) -> None:
+    with open(dst_path, "wb") as dst:
+        try:
+            src_fd = stream.fileno()
+        except (AttributeError, OSError):
+            src_fd = None
+        if src_fd is not None and hasattr(os, "sendfile"):
+            size = os.fstat(src_fd).st_size
+            total = 0
+            while total < size:
+                sent = os.sendfile(dst.fileno(), src_fd, total, size - total)
+                if sent == 0:
+                    break
+                total += sent
+        else:
+            shutil.copyfileobj(stream, dst, length=1 << 20)
+        dst.flush()
+        os.fsync(dst.fileno())
+
+
+def _sha256_of_source(src: str | bytes) -> str:
+    digest = hashlib.sha256()
+    if isinstance(src, bytes):
+        digest.update(src)
+    else:
+        with open(src, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sweep_cache_once() -> None:
+    entries = []
+    total = 0
+    with os.scandir(CACHE_DIR) as scanner:
+        for entry in scanner:
+            if entry.is_file():
+                stats = entry.stat()
+                entries.append((stats.st_mtime, stats.st_size, entry.path))
+                total += stats.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= CACHE_MAX_BYTES:
+            break
+        safe_unlink(path)
+        total -= size
+
+
+def _cache_sweep_loop() -> None:
+    while True:
+        time.sleep(CACHE_SWEEP_INTERVAL_SECONDS)
+        try:
+            _sweep_cache_once()
+        except OSError:
+            logger.warning("Önbellek taraması başarısız oldu.")
+
+
+if not _IS_POOL_WORKER:
+    threading.Thread(
+        target=_cache_sweep_loop, daemon=True, name="cache-sweep"
+    ).start()
+
+
+def _do_convert(
+    src: str | bytes, dst_path: str, start: int = 0, end: int | None = None
+) -> None:
+    if isinstance(src, bytes):
+        converter = Converter(stream=src)
+    else:
+        converter = Converter(src)
+    try:
+        converter.convert(dst_path, start=start, end=end)
+    finally:
+        converter.close()
+
+
+def _convert_parallel(
+    pool: ProcessPoolExecutor, src: str | bytes, dst_path: str, page_count: int
+) -> None:
+    shard_count = min(CONVERT_WORKERS, page_count // (PARALLEL_PAGE_THRESHOLD // 2))
+    pages_per_shard = -(-page_count // shard_count)
+    futures = []
+    shard_paths = []
+    try:
+        for index, start in enumerate(range(0, page_count, pages_per_shard)):
+            shard_path = f"{dst_path}.{index}"
+            shard_paths.append(shard_path)
+            futures.append(
+                pool.submit(
+                    _do_convert,
+                    src,
+                    shard_path,
+                    start,
+                    min(start + pages_per_shard, page_count),
+                )
+            )
+        for future in futures:
+            future.result(timeout=CONVERT_TIMEOUT_SECONDS)
+        composer = Composer(Document(shard_paths[0]))
+        for shard_path in shard_paths[1:]:
+            composer.append(Document(shard_path))
+        composer.save(dst_path)
+    finally:
+        for shard_path in shard_paths:
+            safe_unlink(shard_path)
+
+
+_UNIQUE_COUNTER = itertools.count()
+
+_PDF_MIMETYPES = frozenset({"application/pdf", "application/x-pdf"})
+
+
 def is_allowed_pdf(filename: str, mimetype: str | None) -> bool:
-    extension = os.path.splitext((filename or "").lower())[1]
-    if extension not in ALLOWED_EXTENSIONS:
+    if not filename or not filename.lower().endswith(".pdf"):
         return False
-    if not mimetype:
-        return True
-    return mimetype in {"application/pdf", "application/x-pdf"}
+    return not mimetype or mimetype in _PDF_MIMETYPES
+
+
+_U32 = struct.Struct("!I")
+_IHDR_STRUCT = struct.Struct("!IIBBBBB")
 
 
 def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
-    length = struct.pack("!I", len(data))
-    crc = struct.pack("!I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
-    return length + chunk_type + data + crc
+    length = _U32.pack(len(data))
+    crc = _U32.pack(_crc32(data, _crc32(chunk_type)) & 0xFFFFFFFF)
+    return b"".join((length, chunk_type, data, crc))
 
 
 def generate_solid_png(size: int, rgb: tuple[int, int, int]) -> bytes:
@@ -104,22 +432,105 @@ def generate_solid_png(size: int, rgb: tuple[int, int, int]) -> bytes:
     width = size
     height = size
 
-    ihdr = struct.pack("!IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    ihdr = _IHDR_STRUCT.pack(width, height, 8, 2, 0, 0, 0)
 
-    row = bytes([rgb[0], rgb[1], rgb[2]]) * width
-    raw = b"".join(b"\x00" + row for _ in range(height))
-    compressed = zlib.compress(raw, level=9)
+    first_row = b"\x02" + bytes(rgb) * width
+    up_row = b"\x02" + b"\x00" * (3 * width)
+    raw = first_row + up_row * (height - 1)
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 15, 8, zlib.Z_RLE)
+    compressed = compressor.compress(raw) + compressor.flush()
 
-    return (
-        signature
-        + _png_chunk(b"IHDR", ihdr)
-        + _png_chunk(b"IDAT", compressed)
-        + _png_chunk(b"IEND", b"")
+    return b"".join(
+        (
+            signature,
+            _png_chunk(b"IHDR", ihdr),
+            _png_chunk(b"IDAT", compressed),
+            _png_chunk(b"IEND", b""),
+        )
     )
 
 
-PWA_ICON_192 = generate_solid_png(192, (11, 18, 48))
-PWA_ICON_512 = generate_solid_png(512, (11, 18, 48))
+# Embedded output of generate_solid_png(size, (11, 18, 48)); regenerate with
+# that helper if the brand color or sizes change.
+PWA_ICON_192 = base64.b64decode(
+    b"iVBORw0KGgoAAAANSUhEUgAAAMAAAADACAIAAADdvvtQAAAC0ElEQVR4Ae3BMREAAAwCsR4rG0rw"
+    b"r64iWD+RU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp1"
+    b"6tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSp"
+    b"U6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dO"
+    b"nTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpU6dOnTp16tSpDhjogIEO"
+    b"GOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjo"
+    b"gIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICB"
+    b"DhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y"
+    b"6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiA"
+    b"gQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEO"
+    b"GOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjo"
+    b"gIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICB"
+    b"DhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y6ICBDhjogIEOGOiAgQ4Y"
+    b"6ICBDhjogIEOGOiAgQ4YPNjlO0FjAxCiAAAAAElFTkSuQmCC"
+)
+
+
+PWA_ICON_512 = base64.b64decode(
+    b"iVBORw0KGgoAAAANSUhEUgAAAgAAAAIACAIAAAB7GkOtAAAJ1klEQVR4Ae3BMREAAAgEIM/V7ZPY"
+    b"P51BBHqyk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZ"
+    b"yU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clO"
+    b"drKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnay"
+    b"k53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd"
+    b"7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexk"
+    b"JzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc7"
+    b"2clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJ"
+    b"Tnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52"
+    b"spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKT"
+    b"nexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53s"
+    b"ZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQn"
+    b"O9nJTnayk53sZCc72clOdrKTnexkJzvZyU52spOd7GQnO9nJTnayk53sZCc72clOdrKTnexkJzvZ"
+    b"yU52spOd7GQnO9nJTnayk53sZCc72clOtguAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6"
+    b"AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oA"
+    b"eKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4"
+    b"qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHip"
+    b"C4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkL"
+    b"gJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuA"
+    b"l7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CX"
+    b"ugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6"
+    b"AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oA"
+    b"eKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4"
+    b"qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHip"
+    b"C4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkL"
+    b"gJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuA"
+    b"l7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CX"
+    b"ugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6"
+    b"AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oA"
+    b"eKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4"
+    b"qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHip"
+    b"C4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkL"
+    b"gJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuA"
+    b"l7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CX"
+    b"ugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6"
+    b"AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oA"
+    b"eKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4"
+    b"qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHip"
+    b"C4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkL"
+    b"gJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuA"
+    b"l7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CX"
+    b"ugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6"
+    b"AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oA"
+    b"eKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4"
+    b"qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAl7oAeKkLgJe6AHipC4CXugB4qQuAlw4cAZ4BVsOzJgAA"
+    b"AABJRU5ErkJggg=="
+)
+_ICON_192_ETAG = hashlib.md5(PWA_ICON_192).hexdigest()
+_ICON_512_ETAG = hashlib.md5(PWA_ICON_512).hexdigest()
+_ICON_192_DATA_URI = "data:image/png;base64," + base64.b64encode(PWA_ICON_192).decode()
+_ICON_512_DATA_URI = "data:image/png;base64," + base64.b64encode(PWA_ICON_512).decode()
+
+
+def _serve_icon_png(body: bytes, etag: str) -> Response:
+    response = Response(body, mimetype="image/png")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
 
 
 SERVICE_WORKER_JS = f"""
@@ -127,7 +538,7 @@ const CACHE_NAME = "nebuladocx-cache-v{APP_VERSION}";
 const APP_SHELL = [
   "/",
   "/manifest.webmanifest",
-  "/pwa-icon.svg"
+  "{ASSET_PREFIX}/pwa-icon.svg"
 ];
 
 self.addEventListener("install", (event) => {{
@@ -194,6 +605,85 @@ PWA_ICON_SVG = """
 """
 
 
+MANIFEST_PAYLOAD = {
+    "name": APP_NAME,
+    "short_name": APP_SHORT_NAME,
+    "description": "PDF dosyalarını hızlı ve güvenli şekilde DOCX formatına dönüştürün.",
+    "start_url": "/",
+    "scope": "/",
+    "display": "standalone",
+    "orientation": "portrait-primary",
+    "background_color": "#0B1230",
+    "theme_color": "#0B1230",
+    "lang": "tr",
+    "icons": [
+        {
+            "src": _ICON_192_DATA_URI,
+            "sizes": "192x192",
+            "type": "image/png",
+            "purpose": "any maskable",
+        },
+        {
+            "src": _ICON_512_DATA_URI,
+            "sizes": "512x512",
+            "type": "image/png",
+            "purpose": "any maskable",
+        },
+        {
+            "src": "/pwa-icon.svg",
+            "sizes": "any",
+            "type": "image/svg+xml",
+            "purpose": "any maskable",
+        },
+    ],
+}
+
+
+def _precompress_asset(
+    body: bytes,
+    mimetype: str,
+    cache_control: str = "public, max-age=3600",
+    extra_headers: dict[str, str] | None = None,
+) -> dict:
+    gz_body = gzip.compress(body, compresslevel=6)
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    headers = {
+        "Content-Type": mimetype,
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if extra_headers:
+        headers.update(extra_headers)
+    return {
+        "body": body,
+        "gz_body": gz_body,
+        "etag": etag,
+        "headers": headers,
+        "gz_headers": {**headers, "Content-Encoding": "gzip"},
+    }
+
+
+_SW_ASSET = _precompress_asset(
+    SERVICE_WORKER_JS.encode("utf-8"),
+    "application/javascript",
+    cache_control="no-cache",
+    extra_headers={"Service-Worker-Allowed": "/"},
+)
+_SVG_ASSET = _precompress_asset(PWA_ICON_SVG.encode("utf-8"), "image/svg+xml")
+_MANIFEST_ASSET = _precompress_asset(
+    _json_dumps(MANIFEST_PAYLOAD), "application/manifest+json"
+)
+
+
+def _serve_precompressed(asset: dict):
+    if request.headers.get("If-None-Match") == asset["etag"]:
+        return "", 304, {"ETag": asset["etag"]}
+    if "gzip" in request.accept_encodings:
+        return asset["gz_body"], 200, asset["gz_headers"]
+    return asset["body"], 200, asset["headers"]
+
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="tr">
@@ -722,74 +1212,77 @@ HTML_TEMPLATE = """
 """
 
 
+_INDEX_PREFIX, _INDEX_SUFFIX = (
+    part.encode("utf-8")
+    for part in HTML_TEMPLATE.replace(
+        "/pwa-icon.svg", f"{ASSET_PREFIX}/pwa-icon.svg"
+    ).split("{{ conversion_count }}")
+)
+
+
+_INDEX_HEADERS = {"Content-Type": "text/html; charset=utf-8", "Vary": "Accept-Encoding"}
+_INDEX_GZ_HEADERS = {**_INDEX_HEADERS, "Content-Encoding": "gzip"}
+
+
 @app.route("/")
 def index():
-    return render_template_string(
-        HTML_TEMPLATE,
-        conversion_count=get_conversion_count(),
-    )
+    body = _INDEX_PREFIX + str(get_conversion_count()).encode("ascii") + _INDEX_SUFFIX
+    if "gzip" in request.accept_encodings:
+        return gzip.compress(body, compresslevel=1), 200, _INDEX_GZ_HEADERS
+    return body, 200, _INDEX_HEADERS
 
 
 @app.route("/manifest.webmanifest")
 def web_manifest():
-    manifest_payload = {
-        "name": APP_NAME,
-        "short_name": APP_SHORT_NAME,
-        "description": "PDF dosyalarını hızlı ve güvenli şekilde DOCX formatına dönüştürün.",
-        "start_url": "/",
-        "scope": "/",
-        "display": "standalone",
-        "orientation": "portrait-primary",
-        "background_color": "#0B1230",
-        "theme_color": "#0B1230",
-        "lang": "tr",
-        "icons": [
-            {
-                "src": "/pwa-icon-192.png",
-                "sizes": "192x192",
-                "type": "image/png",
-                "purpose": "any maskable",
-            },
-            {
-                "src": "/pwa-icon-512.png",
-                "sizes": "512x512",
-                "type": "image/png",
-                "purpose": "any maskable",
-            },
-            {
-                "src": "/pwa-icon.svg",
-                "sizes": "any",
-                "type": "image/svg+xml",
-                "purpose": "any maskable",
-            },
-        ],
-    }
-    response = jsonify(manifest_payload)
-    response.mimetype = "application/manifest+json"
-    return response
+    return _serve_precompressed(_MANIFEST_ASSET)
 
 
 @app.route("/service-worker.js")
 def service_worker():
-    response = Response(SERVICE_WORKER_JS, mimetype="application/javascript")
-    response.headers["Service-Worker-Allowed"] = "/"
-    response.headers["Cache-Control"] = "no-cache"
-    return response
+    return _serve_precompressed(_SW_ASSET)
 
 
 @app.route("/pwa-icon.svg")
 def pwa_icon():
-    return Response(PWA_ICON_SVG, mimetype="image/svg+xml")
+    return _serve_precompressed(_SVG_ASSET)
 
 
 @app.route("/pwa-icon-192.png")
 def pwa_icon_192():
-    return Response(PWA_ICON_192, mimetype="image/png")
+    return _serve_icon_png(PWA_ICON_192, _ICON_192_ETAG)
 
 
 @app.route("/pwa-icon-512.png")
 def pwa_icon_512():
-    return Response(PWA_ICON_512, mimetype="image/png")
+    return _serve_icon_png(PWA_ICON_512, _ICON_512_ETAG)
+
+
+_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+_VERSIONED_ASSETS = {
+    "pwa-icon.svg": (
+        _SVG_ASSET["body"],
+        {"Content-Type": "image/svg+xml", "Cache-Control": _IMMUTABLE_CACHE},
+    ),
+    "pwa-icon-192.png": (
+        PWA_ICON_192,
+        {"Content-Type": "image/png", "Cache-Control": _IMMUTABLE_CACHE},
+    ),
+    "pwa-icon-512.png": (
+        PWA_ICON_512,
+        {"Content-Type": "image/png", "Cache-Control": _IMMUTABLE_CACHE},
+    ),
+}
+
+
+@app.route("/static/<version>/<asset>")
+def versioned_asset(version: str, asset: str):
+    if version != APP_VERSION:
+        abort(404)
+    entry = _VERSIONED_ASSETS.get(asset)
+    if entry is None:
+        abort(404)
+    body, headers = entry
+    return body, 200, headers
 
 
 @app.route("/favicon.ico")
@@ -802,13 +1295,27 @@ def healthz():
     return jsonify({"status": "ok", "service": APP_NAME, "version": APP_VERSION})
 
 
-@app.after_request
-def add_security_headers(response):
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Cross-Origin-Resource-Policy"] = "same-origin"
-    return response
+_SECURITY_HEADERS = [
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+    ("Cross-Origin-Resource-Policy", "same-origin"),
+]
+
+
+class SecurityHeadersMiddleware:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        def _start_response(status, headers, exc_info=None):
+            headers.extend(_SECURITY_HEADERS)
+            return start_response(status, headers, exc_info)
+
+        return self.wsgi_app(environ, _start_response)
+
+
+app.wsgi_app = SecurityHeadersMiddleware(app.wsgi_app)
 
 
 @app.errorhandler(400)
@@ -817,11 +1324,11 @@ def handle_400(err):
 
 
 @app.errorhandler(413)
-def handle_413(_):
-    return (
-        jsonify({"error": "Dosya boyutu çok büyük. Maksimum 35MB desteklenir."}),
-        413,
-    )
+def handle_413(err):
+    description = getattr(err, "description", None)
+    if not description or description == RequestEntityTooLarge.description:
+        description = "Dosya boyutu çok büyük. Maksimum 35MB desteklenir."
+    return jsonify({"error": description}), 413
 
 
 @app.errorhandler(500)
@@ -829,6 +1336,11 @@ def handle_500(err):
     return jsonify({"error": getattr(err, "description", "Sunucu hatası oluştu.")}), 500
 
 
+@app.errorhandler(503)
+def handle_503(err):
+    return jsonify({"error": getattr(err, "description", "Sunucu şu anda yoğun.")}), 503
+
+
 @app.route("/convert", methods=["POST"])
 def convert():
     if "pdf" not in request.files:
@@ -841,56 +1353,113 @@ def convert():
     if not is_allowed_pdf(filename, pdf_file.mimetype):
         abort(400, description="Yalnızca PDF dosyası yükleyebilirsiniz.")
 
+    head = pdf_file.stream.read(8)
+    pdf_file.stream.seek(0)
+    if not head.startswith(b"%PDF-"):
+        abort(400, description="Geçerli PDF başlığı yok.")
+
     source_stem = sanitize_name(os.path.splitext(filename)[0])
-    unique_suffix = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
-    output_name = (
-        sanitize_name(f"{OUTPUT_FILENAME_PREFIX}_{source_stem}_{unique_suffix}")
-        + ".docx"
-    )
+    unique_suffix = f"{time.time_ns():x}_{next(_UNIQUE_COUNTER):x}"
+    # Budget the 120-char cap against the stem only; truncating the composed
+    # name would drop the uniqueness suffix and let two uploads collide.
+    stem_limit = 120 - len(OUTPUT_FILENAME_PREFIX) - len(unique_suffix) - 2
+    source_stem = source_stem[:stem_limit].rstrip("._")
+    output_name = f"{OUTPUT_FILENAME_PREFIX}_{source_stem}_{unique_suffix}.docx"
     final_path = os.path.join(OUTPUT_DIR, output_name)
+    part_path = final_path + ".part"
+
+    if not _convert_slots.acquire(blocking=False):
+        abort(503, description="Sunucu şu anda yoğun. Lütfen birazdan tekrar deneyin.")
 
     temp_pdf_path = ""
-    temp_docx_path = ""
-    converter = None
+    pool = CONVERT_POOL
 
     try:
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=".pdf", dir=TEMP_DIR
-        ) as temp_pdf:
-            pdf_file.save(temp_pdf)
-            temp_pdf_path = temp_pdf.name
-
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=".docx", dir=TEMP_DIR
-        ) as temp_docx:
-            temp_docx_path = temp_docx.name
-
-        converter = Converter(temp_pdf_path)
-        converter.convert(temp_docx_path, start=0)
-
-        shutil.move(temp_docx_path, final_path)
-        temp_docx_path = ""
+        content_length = request.content_length
+        if content_length and content_length < SMALL_PDF_LIMIT:
+            pdf_source: str | bytes = pdf_file.stream.read()
+        else:
+            temp_pdf_path = _SCRATCH_POOL.get()
+            _save_upload(pdf_file.stream, temp_pdf_path)
+            pdf_source = temp_pdf_path
+
+        cache_path = os.path.join(
+            CACHE_DIR, _sha256_of_source(pdf_source) + ".docx"
+        )
+        cache_hit = False
+        try:
+            os.link(cache_path, final_path)
+            os.utime(cache_path)
+            cache_hit = True
+            logger.info("Önbellekten sunuluyor: %s", output_name)
+        except OSError:
+            pass
+
+        if not cache_hit:
+            try:
+                page_count = _page_count(pdf_source)
+            except Exception:
+                abort(400, description="PDF dosyası açılamadı.")
+            if page_count > MAX_PAGES:
+                abort(413, description=f"Sayfa sayısı {MAX_PAGES} üzerinde.")
+
+            if (
+                Composer is not None
+                and CONVERT_WORKERS > 1
+                and page_count >= PARALLEL_PAGE_THRESHOLD
+            ):
+                _convert_parallel(pool, pdf_source, part_path, page_count)
+            else:
+                pool.submit(
+                    _do_convert, pdf_source, part_path, 0, MAX_PAGES
+                ).result(timeout=CONVERT_TIMEOUT_SECONDS)
+            os.replace(part_path, final_path)
+            try:
+                os.link(final_path, cache_path)
+            except OSError:
+                logger.warning("Önbelleğe bağlanamadı: %s", cache_path)
 
         increment_conversion_count()
 
         response = send_file(
-            final_path, as_attachment=True, download_name=output_name, max_age=0
+            final_path,
+            as_attachment=True,
+            download_name=output_name,
+            conditional=True,
+            etag=True,
         )
+        if USE_X_SENDFILE:
+            response.headers["X-Accel-Redirect"] = "/_protected/" + output_name
         logger.info("Dönüştürme başarılı: %s", output_name)
         return response
+    except HTTPException:
+        raise
+    except BrokenProcessPool:
+        logger.exception("Dönüştürme işçisi çöktü")
+        _reset_convert_pool(pool)
+        abort(
+            500,
+            description="Dönüştürme beklenmedik şekilde sonlandı. Lütfen tekrar deneyin.",
+        )
     except Exception as exc:
         logger.exception("Dönüştürme hatası")
         abort(500, description=f"Dönüştürme sırasında hata oluştu: {exc}")
     finally:
-        if converter is not None:
+        _convert_slots.release()
+        if temp_pdf_path:
             try:
-                converter.close()
-            except Exception:
-                logger.warning("Converter kapanışı sırasında hata oluştu.")
-        safe_unlink(temp_pdf_path)
-        safe_unlink(temp_docx_path)
+                os.truncate(temp_pdf_path, 0)
+            except OSError:
+                logger.warning("Geçici dosya sıfırlanamadı: %s", temp_pdf_path)
+            _SCRATCH_POOL.put(temp_pdf_path)
+        safe_unlink(part_path)
 
 
 if __name__ == "__main__":
     debug_mode = os.getenv("FLASK_DEBUG", "false").lower() == "true"
-    app.run(host="0.0.0.0", port=5000, debug=debug_mode)
+    if debug_mode:
+        app.run(host="0.0.0.0", port=5000, debug=True)
+    else:
+        from waitress import serve
+
+        serve(app, host="0.0.0.0", port=5000, threads=8)
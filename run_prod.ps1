@@ -9,4 +9,4 @@ python -m pip install --upgrade pip
 pip install -r requirements.txt
 
 $env:FLASK_DEBUG = "false"
-python -m waitress --host=0.0.0.0 --port=5000 PDFTODOCX:app
+python -m waitress --host=0.0.0.0 --port=5000 --threads=8 PDFTODOCX:app